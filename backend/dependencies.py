@@ -0,0 +1,8 @@
+from fastapi import Request
+
+from services.qdrant_service import QdrantService
+
+
+def get_qdrant_service(request: Request) -> QdrantService:
+    """Get the Qdrant service created at application startup"""
+    return request.app.state.qdrant
@@ -1,8 +1,11 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from routers import documents, search
+from services.qdrant_service import QdrantService
 
 # Configure logging
 logging.basicConfig(
@@ -11,13 +14,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize services on startup and release them on shutdown"""
+    logger.info("Starting Medya Takip Merkezi Vector Database API...")
+    
+    try:
+        service = QdrantService()
+        await service.initialize()
+        # Run one encode so the first real request doesn't pay model warm-up
+        await service.embedding_service.encode_batch_async(["warmup"])
+        app.state.qdrant = service
+        logger.info("Qdrant service initialized successfully")
+    except Exception as e:
+        logger.error(f"Failed to initialize Qdrant service: {e}")
+        raise
+    
+    yield
+    
+    logger.info("Shutting down Medya Takip Merkezi Vector Database API...")
+    await service.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Medya Takip Merkezi - Vector Database",
     description="Qdrant tabanlı semantik arama ve doküman yönetimi API'si",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -53,24 +81,3 @@ async def api_info():
             "docs": "/api/docs"
         }
     }
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on startup"""
-    logger.info("Starting Medya Takip Merkezi Vector Database API...")
-    
-    # Initialize services (this will load the embedding model)
-    from services.qdrant_service import get_qdrant_service
-    try:
-        service = get_qdrant_service()
-        logger.info("Qdrant service initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize Qdrant service: {e}")
-        raise
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown"""
-    logger.info("Shutting down Medya Takip Merkezi Vector Database API...")
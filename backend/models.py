@@ -37,11 +37,6 @@ class Document(DocumentBase):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 
 class BulkDocumentCreate(BaseModel):
     """Model for bulk document creation"""
@@ -78,14 +73,6 @@ class SearchResult(BaseModel):
     metadata: Dict[str, Any]
 
 
-class SearchResponse(BaseModel):
-    """Model for search response"""
-    query: str
-    total_results: int
-    results: List[SearchResult]
-    relationships: Optional[List[Dict[str, Any]]] = None
-
-
 class RelationshipNode(BaseModel):
     """Model for relationship graph nodes"""
     id: str
@@ -107,6 +94,14 @@ class RelationshipGraph(BaseModel):
     edges: List[RelationshipEdge]
 
 
+class SearchResponse(BaseModel):
+    """Model for search response"""
+    query: str
+    total_results: int
+    results: List[SearchResult]
+    relationships: Optional[RelationshipGraph] = None
+
+
 class CollectionStats(BaseModel):
     """Model for collection statistics"""
     total_documents: int
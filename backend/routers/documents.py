@@ -1,30 +1,30 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
 
 from models import (
     DocumentCreate, DocumentUpdate, Document, 
     BulkDocumentCreate
 )
-from services.qdrant_service import get_qdrant_service
+from dependencies import get_qdrant_service
+from services.qdrant_service import QdrantService
 
 router = APIRouter(prefix="/api/documents", tags=["documents"])
 
 
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
-async def create_document(document: DocumentCreate):
+async def create_document(document: DocumentCreate, service: QdrantService = Depends(get_qdrant_service)):
     """Create a new document"""
-    service = get_qdrant_service()
     doc_dict = document.model_dump()
-    doc_id = service.add_document(doc_dict)
+    doc_id = await service.add_document(doc_dict)
     return {"id": doc_id, "message": "Doküman başarıyla oluşturuldu"}
 
 
 @router.post("/bulk", response_model=dict, status_code=status.HTTP_201_CREATED)
-async def create_documents_bulk(bulk: BulkDocumentCreate):
+async def create_documents_bulk(bulk: BulkDocumentCreate, service: QdrantService = Depends(get_qdrant_service)):
     """Create multiple documents in bulk"""
-    service = get_qdrant_service()
     docs = [doc.model_dump() for doc in bulk.documents]
-    doc_ids = service.add_documents_bulk(docs)
+    async with service.bulk_upload_mode(len(docs)):
+        doc_ids = await service.add_documents_bulk(docs)
     return {
         "ids": doc_ids,
         "count": len(doc_ids),
@@ -32,27 +32,28 @@ async def create_documents_bulk(bulk: BulkDocumentCreate):
     }
 
 
-@router.get("", response_model=List[dict])
-async def list_documents(limit: int = 100, offset: int = 0):
-    """List all documents with pagination"""
-    service = get_qdrant_service()
-    documents = service.get_all_documents(limit=limit, offset=offset)
-    return documents
+@router.get("", response_model=dict)
+async def list_documents(
+    limit: int = 100,
+    offset: Optional[str] = None,
+    service: QdrantService = Depends(get_qdrant_service)
+):
+    """List documents with cursor pagination (pass back next_offset as offset)"""
+    page = await service.get_all_documents(limit=limit, offset=offset)
+    return page
 
 
 @router.get("/stats", response_model=dict)
-async def get_stats():
+async def get_stats(service: QdrantService = Depends(get_qdrant_service)):
     """Get collection statistics"""
-    service = get_qdrant_service()
-    stats = service.get_collection_stats()
+    stats = await service.get_collection_stats()
     return stats
 
 
 @router.get("/{doc_id}", response_model=dict)
-async def get_document(doc_id: str):
+async def get_document(doc_id: str, service: QdrantService = Depends(get_qdrant_service)):
     """Get a document by ID"""
-    service = get_qdrant_service()
-    document = service.get_document(doc_id)
+    document = await service.get_document(doc_id)
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -62,9 +63,8 @@ async def get_document(doc_id: str):
 
 
 @router.put("/{doc_id}", response_model=dict)
-async def update_document(doc_id: str, updates: DocumentUpdate):
+async def update_document(doc_id: str, updates: DocumentUpdate, service: QdrantService = Depends(get_qdrant_service)):
     """Update a document"""
-    service = get_qdrant_service()
     update_dict = {k: v for k, v in updates.model_dump().items() if v is not None}
     
     if not update_dict:
@@ -73,7 +73,7 @@ async def update_document(doc_id: str, updates: DocumentUpdate):
             detail="Güncellenecek alan belirtilmedi"
         )
     
-    success = service.update_document(doc_id, update_dict)
+    success = await service.update_document(doc_id, update_dict)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -84,10 +84,9 @@ async def update_document(doc_id: str, updates: DocumentUpdate):
 
 
 @router.delete("/{doc_id}", response_model=dict)
-async def delete_document(doc_id: str):
+async def delete_document(doc_id: str, service: QdrantService = Depends(get_qdrant_service)):
     """Delete a document"""
-    service = get_qdrant_service()
-    success = service.delete_document(doc_id)
+    success = await service.delete_document(doc_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,18 +1,28 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Optional
 
-from models import SearchQuery, SimilarQuery, SearchResponse, RelationshipGraph
-from services.qdrant_service import get_qdrant_service
+from models import SearchQuery, SimilarQuery, SearchResult, SearchResponse, RelationshipGraph
+from dependencies import get_qdrant_service
+from services.qdrant_service import QdrantService, build_filter
 
 router = APIRouter(prefix="/api/search", tags=["search"])
 
+# Payload keys copied into each SearchResult, with the value used when missing
+_SEARCH_DEFAULTS = {
+    "title": "",
+    "content": "",
+    "source": None,
+    "source_type": None,
+    "category": None,
+    "tags": [],
+    "metadata": {}
+}
+
 
 @router.post("", response_model=SearchResponse)
-async def search_documents(query: SearchQuery):
+async def search_documents(query: SearchQuery, service: QdrantService = Depends(get_qdrant_service)):
     """Search for documents using semantic similarity"""
-    service = get_qdrant_service()
-    
-    results = service.search(
+    results = await service.search(
         query=query.query,
         limit=query.limit,
         score_threshold=query.score_threshold,
@@ -25,24 +35,19 @@ async def search_documents(query: SearchQuery):
     relationships = None
     if len(results) >= 2:
         doc_ids = [r["id"] for r in results]
-        nodes, edges = service.get_relationships(doc_ids, similarity_threshold=0.5)
+        nodes, edges = await service.get_relationships(doc_ids, similarity_threshold=0.5)
         relationships = {"nodes": nodes, "edges": edges}
     
+    # Payloads come straight from Qdrant, so skip re-validating every result
     return SearchResponse(
         query=query.query,
         total_results=len(results),
         results=[
-            {
-                "id": r["id"],
-                "title": r.get("title", ""),
-                "content": r.get("content", ""),
-                "source": r.get("source"),
-                "source_type": r.get("source_type"),
-                "category": r.get("category"),
-                "tags": r.get("tags", []),
-                "score": r.get("score", 0),
-                "metadata": r.get("metadata", {})
-            }
+            SearchResult.model_construct(
+                id=str(r["id"]),
+                score=r["score"],
+                **{k: r.get(k, default) for k, default in _SEARCH_DEFAULTS.items()}
+            )
             for r in results
         ],
         relationships=relationships
@@ -50,22 +55,21 @@ async def search_documents(query: SearchQuery):
 
 
 @router.post("/similar", response_model=dict)
-async def find_similar(query: SimilarQuery):
+async def find_similar(query: SimilarQuery, service: QdrantService = Depends(get_qdrant_service)):
     """Find documents similar to a given document"""
-    service = get_qdrant_service()
-    
     # Check if document exists
-    doc = service.get_document(query.document_id)
+    doc = await service.get_document(query.document_id)
     if not doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Referans doküman bulunamadı"
         )
     
-    results = service.find_similar(
+    results = await service.find_similar(
         doc_id=query.document_id,
         limit=query.limit,
-        score_threshold=query.score_threshold
+        score_threshold=query.score_threshold,
+        content_hash=doc.get("content_hash")
     )
     
     return {
@@ -82,23 +86,25 @@ async def find_similar(query: SimilarQuery):
 async def explore_relationships(
     limit: int = 50,
     category: Optional[str] = None,
-    source_type: Optional[str] = None
+    source_type: Optional[str] = None,
+    service: QdrantService = Depends(get_qdrant_service)
 ):
     """Get relationship graph for exploration"""
-    service = get_qdrant_service()
-    
-    # Get all documents with optional filters
-    all_docs = service.get_all_documents(limit=limit)
-    
-    if category:
-        all_docs = [d for d in all_docs if d.get("category") == category]
-    if source_type:
-        all_docs = [d for d in all_docs if d.get("source_type") == source_type]
+    # Let Qdrant apply the optional filters (both fields are indexed) and
+    # stop as soon as enough documents have come back
+    doc_ids = []
+    async for point in service.iter_documents(
+        scroll_filter=build_filter(category, source_type, None),
+        with_payload=False,
+        batch_size=max(1, min(limit, 256))
+    ):
+        doc_ids.append(str(point.id))
+        if len(doc_ids) >= limit:
+            break
     
-    if len(all_docs) < 2:
+    if len(doc_ids) < 2:
         return RelationshipGraph(nodes=[], edges=[])
     
-    doc_ids = [d["id"] for d in all_docs]
-    nodes, edges = service.get_relationships(doc_ids, similarity_threshold=0.5)
+    nodes, edges = await service.get_relationships(doc_ids, similarity_threshold=0.5)
     
     return RelationshipGraph(nodes=nodes, edges=edges)
@@ -1,20 +1,137 @@
 from sentence_transformers import SentenceTransformer
-from typing import List, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
 import numpy as np
+import asyncio
 import logging
+import os
+import threading
+import torch
 
 logger = logging.getLogger(__name__)
 
 
+def _available_cpus() -> int:
+    """CPUs this process may run on, honouring affinity / container cpusets"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class OnnxSentenceEncoder:
+    """Int8-quantized ONNX Runtime encoder exposing the SentenceTransformer encode API"""
+    
+    def __init__(self, model_name: str, max_seq_length: int = 128):
+        # Optional dependency: pip install optimum[onnxruntime]
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+        
+        cache_root = os.getenv("ONNX_CACHE_DIR", os.path.expanduser("~/.cache/mtm-onnx"))
+        save_dir = os.path.join(cache_root, model_name.replace("/", "__"))
+        quantized_file = "model_quantized.onnx"
+        
+        if not os.path.exists(os.path.join(save_dir, quantized_file)):
+            logger.info(f"Exporting and quantizing {model_name} to {save_dir}")
+            ort_model = ORTModelForFeatureExtraction.from_pretrained(
+                model_name, export=True, provider="CPUExecutionProvider"
+            )
+            ort_model.save_pretrained(save_dir)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(save_dir)
+            
+            quantizer = ORTQuantizer.from_pretrained(ort_model)
+            quantizer.quantize(
+                save_dir=save_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            )
+        
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            save_dir, file_name=quantized_file, provider="CPUExecutionProvider"
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(save_dir)
+        self.max_seq_length = max_seq_length
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.config.hidden_size
+    
+    def encode(
+        self,
+        sentences: List[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
+        """Mean-pooled sentence embeddings, matching the sentence-transformers pipeline"""
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            encoded = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            token_embeddings = self.model(**encoded).last_hidden_state
+            
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+            batches.append(embeddings.astype(np.float32))
+        
+        if not batches:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.concatenate(batches)
+
+
 class EmbeddingService:
     """Service for generating text embeddings using sentence-transformers"""
     
+    # Number of query embeddings kept in the LRU cache
+    QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "10000"))
+    
+    # Token window for the model; longer inputs are truncated by the tokenizer
+    MAX_SEQ_LENGTH = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", "256"))
+    
+    # Concurrent forward passes; the available CPUs are split between them
+    ENCODE_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "2"))
+    ENCODE_THREADS = int(os.getenv("EMBEDDING_THREADS", "0")) or max(1, _available_cpus() // ENCODE_WORKERS)
+    
     def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"):
         """Initialize the embedding service with specified model"""
         logger.info(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        torch.set_num_threads(self.ENCODE_THREADS)
+        self.model = self._load_model(model_name)
+        self.model.max_seq_length = self.MAX_SEQ_LENGTH
+        self.batch_size = 128 if torch.cuda.is_available() else 32
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         logger.info(f"Model loaded. Embedding dimension: {self.embedding_dim}")
+        
+        # Encoding runs in worker threads, so cache access is guarded by a lock
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        
+        # Dedicated pool so model inference never runs on the event loop
+        self._pool = ThreadPoolExecutor(max_workers=self.ENCODE_WORKERS, thread_name_prefix="embedding")
+    
+    @staticmethod
+    def _load_model(model_name: str):
+        """Load FP16 on GPU, int8 ONNX on CPU when requested, FP32 otherwise"""
+        if torch.cuda.is_available():
+            logger.info("CUDA available, using FP16 model on GPU")
+            return SentenceTransformer(model_name, device="cuda").half()
+        
+        if os.getenv("EMBEDDING_BACKEND", "torch") == "onnx":
+            try:
+                encoder = OnnxSentenceEncoder(model_name)
+                logger.info("Using int8-quantized ONNX Runtime model on CPU")
+                return encoder
+            except ImportError as e:
+                logger.warning(f"ONNX backend unavailable ({e}), falling back to PyTorch")
+        
+        return SentenceTransformer(model_name)
     
     def encode(self, text: Union[str, List[str]], normalize: bool = True) -> np.ndarray:
         """
@@ -38,21 +155,70 @@ class EmbeddingService:
         
         return embeddings
     
-    def encode_single(self, text: str) -> List[float]:
-        """Generate embedding for a single text and return as list"""
+    def encode_single(self, text: str) -> np.ndarray:
+        """Generate embedding for a single text as a float32 array
+        
+        The array is passed to qdrant-client as is; no Python list is built here.
+        """
         embedding = self.encode(text)
-        return embedding[0].tolist()
+        return embedding[0].astype(np.float32, copy=False)
     
-    def encode_batch(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+    def encode_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
         """Generate embeddings for multiple texts"""
         embeddings = self.model.encode(
             texts,
             normalize_embeddings=True,
-            batch_size=batch_size,
+            batch_size=batch_size or self.batch_size,
             show_progress_bar=len(texts) > 100
         )
         return embeddings.tolist()
     
+    def encode_queries(self, queries: List[str]) -> List[List[float]]:
+        """Generate embeddings for search queries, reusing cached results"""
+        keys = [" ".join(q.split()) for q in queries]
+        embeddings = [None] * len(keys)
+        misses = {}
+        
+        with self._query_cache_lock:
+            for i, key in enumerate(keys):
+                cached = self._query_cache.get(key)
+                if cached is not None:
+                    self._query_cache.move_to_end(key)
+                    embeddings[i] = cached
+                else:
+                    misses.setdefault(key, []).append(i)
+        
+        if misses:
+            miss_keys = list(misses)
+            for key, embedding in zip(miss_keys, self.encode_batch(miss_keys)):
+                for i in misses[key]:
+                    embeddings[i] = embedding
+            
+            with self._query_cache_lock:
+                for key in miss_keys:
+                    self._query_cache[key] = embeddings[misses[key][0]]
+                    self._query_cache.move_to_end(key)
+                while len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+        
+        return embeddings
+    
+    async def _run_in_pool(self, fn, *args):
+        """Run a blocking encode call on the embedding thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+    
+    async def encode_single_async(self, text: str) -> np.ndarray:
+        """Async variant of encode_single that does not block the event loop"""
+        return await self._run_in_pool(self.encode_single, text)
+    
+    async def encode_batch_async(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of encode_batch that does not block the event loop"""
+        return await self._run_in_pool(self.encode_batch, texts)
+    
+    async def encode_queries_async(self, queries: List[str]) -> List[List[float]]:
+        """Async variant of encode_queries that does not block the event loop"""
+        return await self._run_in_pool(self.encode_queries, queries)
+    
     def get_dimension(self) -> int:
         """Get the embedding dimension"""
         return self.embedding_dim
@@ -1,7 +1,13 @@
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models
 from qdrant_client.http.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
-from typing import List, Optional, Dict, Any, Tuple
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Union
+import asyncio
+import hashlib
+import numpy as np
 import os
 import logging
 import uuid
@@ -11,48 +17,194 @@ from services.embedding_service import get_embedding_service
 
 logger = logging.getLogger(__name__)
 
+# Vectors are float32 arrays from the embedding service or lists read back from Qdrant
+Vector = Union[List[float], np.ndarray]
+
+
+# The model only sees its first few hundred tokens, so longer text is cut
+# before tokenization instead of being scanned in full
+MAX_EMBED_CHARS = 2048
+
+
+# Query-time HNSW beam width; int8 candidates are rescored against the
+# original vectors to keep recall close to unquantized search
+SEARCH_PARAMS = models.SearchParams(
+    hnsw_ef=64,
+    quantization=models.QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+
+
+@lru_cache(maxsize=512)
+def build_filter(
+    category: Optional[str],
+    source_type: Optional[str],
+    tags: Optional[Tuple[str, ...]]
+) -> Optional[Filter]:
+    """Build (and memoize) the search filter for a combination of filter values"""
+    conditions = []
+    if category:
+        conditions.append(
+            FieldCondition(key="category", match=MatchValue(value=category))
+        )
+    if source_type:
+        conditions.append(
+            FieldCondition(key="source_type", match=MatchValue(value=source_type))
+        )
+    if tags:
+        for tag in tags:
+            conditions.append(
+                FieldCondition(key="tags", match=MatchValue(value=tag))
+            )
+    
+    return Filter(must=conditions) if conditions else None
+
+
+def _prep_text(title: str, content: str) -> str:
+    """Build the (trimmed) text that is embedded for a document"""
+    return (title + ". " + content)[:MAX_EMBED_CHARS]
+
+
+def _content_hash(text: str) -> str:
+    """Hash of the exact text passed to the model, used to skip re-embedding unchanged documents"""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
 
 class QdrantService:
     """Service for interacting with Qdrant vector database"""
     
+    # Concurrent search() calls are coalesced into one query_batch_points request
+    SEARCH_BATCH_MAX_SIZE = int(os.getenv("SEARCH_BATCH_MAX_SIZE", "32"))
+    SEARCH_BATCH_WINDOW_MS = float(os.getenv("SEARCH_BATCH_WINDOW_MS", "10"))
+    # Batches in flight at once, and the per-batch Qdrant timeout in seconds
+    SEARCH_BATCH_CONCURRENCY = int(os.getenv("SEARCH_BATCH_CONCURRENCY", "4"))
+    SEARCH_TIMEOUT = int(os.getenv("SEARCH_TIMEOUT", "10"))
+    # Pending searches beyond this make search() wait before enqueueing
+    SEARCH_QUEUE_SIZE = int(os.getenv("SEARCH_QUEUE_SIZE", "1024"))
+    
+    # Number of document vectors kept in memory to skip retrieve round-trips.
+    # The cache is per process and only sees writes made through this service,
+    # so each entry carries its content_hash and is only trusted when that hash
+    # matches the payload currently stored in Qdrant.
+    VECTOR_CACHE_SIZE = int(os.getenv("VECTOR_CACHE_SIZE", "10000"))
+    
+    # Bulk uploads are split into batches upserted concurrently
+    BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "64"))
+    BULK_UPLOAD_CONCURRENCY = int(os.getenv("BULK_UPLOAD_CONCURRENCY", "8"))
+    
+    # Bulk uploads smaller than this leave HNSW indexing on
+    BULK_INDEXING_PAUSE_MIN = int(os.getenv("BULK_INDEXING_PAUSE_MIN", "1000"))
+    
     def __init__(self):
         self.host = os.getenv("QDRANT_HOST", "localhost")
         self.port = int(os.getenv("QDRANT_PORT", "6333"))
+        self.grpc_port = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
         self.collection_name = os.getenv("COLLECTION_NAME", "medya_takip")
         
-        logger.info(f"Connecting to Qdrant at {self.host}:{self.port}")
-        self.client = QdrantClient(host=self.host, port=self.port)
+        logger.info(f"Connecting to Qdrant at {self.host}:{self.grpc_port} (gRPC)")
+        self.client = AsyncQdrantClient(
+            host=self.host,
+            port=self.port,
+            grpc_port=self.grpc_port,
+            prefer_grpc=True
+        )
         
         self.embedding_service = get_embedding_service()
-        self._ensure_collection()
+        
+        self._search_queue: Optional[asyncio.Queue] = None
+        self._search_worker: Optional[asyncio.Task] = None
+        self._search_tasks: Dict[asyncio.Task, List[Tuple]] = {}
+        self._vector_cache: "OrderedDict[str, Tuple[str, Vector]]" = OrderedDict()
+        self._bulk_uploads = 0
+        self._indexing_paused = False
+        self._saved_indexing_threshold: Optional[int] = None
     
-    def _ensure_collection(self):
+    async def initialize(self):
+        """Prepare the collection; must be awaited once before serving requests"""
+        await self._ensure_collection()
+        
+        self._search_queue = asyncio.Queue(maxsize=self.SEARCH_QUEUE_SIZE)
+        self._search_worker = asyncio.create_task(self._search_batcher())
+    
+    async def close(self):
+        """Stop background tasks and close the Qdrant connection"""
+        if self._search_worker is not None:
+            self._search_worker.cancel()
+            try:
+                await self._search_worker
+            except asyncio.CancelledError:
+                pass
+            self._search_worker = None
+        
+        tasks = dict(self._search_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Nobody will serve these anymore; cancel them so callers don't hang.
+        # A task cancelled before it started never reached its own cleanup.
+        pending = [entry for batch in tasks.values() for entry in batch]
+        while not self._search_queue.empty():
+            pending.append(self._search_queue.get_nowait())
+        for *_, future in pending:
+            future.cancel()
+        
+        await self.client.close()
+    
+    def _cache_vector(self, doc_id: str, vector: Vector, content_hash: Optional[str]):
+        """Store a document vector in the LRU cache, tagged with its content hash"""
+        if content_hash is None:
+            return
+        self._vector_cache[str(doc_id)] = (content_hash, vector)
+        self._vector_cache.move_to_end(str(doc_id))
+        while len(self._vector_cache) > self.VECTOR_CACHE_SIZE:
+            self._vector_cache.popitem(last=False)
+    
+    def _cached_vector(self, doc_id: str, content_hash: Optional[str]) -> Optional[Vector]:
+        """Get a cached document vector, if present and still matching content_hash"""
+        entry = self._vector_cache.get(str(doc_id))
+        if entry is None or content_hash is None or entry[0] != content_hash:
+            return None
+        self._vector_cache.move_to_end(str(doc_id))
+        return entry[1]
+    
+    async def _ensure_collection(self):
         """Ensure the collection exists with proper configuration"""
-        collections = self.client.get_collections().collections
+        collections = (await self.client.get_collections()).collections
         collection_names = [c.name for c in collections]
         
         if self.collection_name not in collection_names:
             logger.info(f"Creating collection: {self.collection_name}")
-            self.client.create_collection(
+            await self.client.create_collection(
                 collection_name=self.collection_name,
                 vectors_config=VectorParams(
                     size=self.embedding_service.get_dimension(),
-                    distance=Distance.COSINE
-                )
+                    distance=Distance.COSINE,
+                    on_disk=False,
+                    hnsw_config=models.HnswConfigDiff(m=16, ef_construct=128)
+                ),
+                # int8 scalar quantization keeps ~4x fewer vector bytes in RAM
+                quantization_config=models.ScalarQuantization(
+                    scalar=models.ScalarQuantizationConfig(
+                        type=models.ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True
+                    )
+                ),
+                optimizers_config=models.OptimizersConfigDiff(memmap_threshold=20000)
             )
             
             # Create payload indexes for filtering
-            self.client.create_payload_index(
+            await self.client.create_payload_index(
                 collection_name=self.collection_name,
                 field_name="category",
                 field_schema=models.PayloadSchemaType.KEYWORD
             )
-            self.client.create_payload_index(
+            await self.client.create_payload_index(
                 collection_name=self.collection_name,
                 field_name="source_type",
                 field_schema=models.PayloadSchemaType.KEYWORD
             )
-            self.client.create_payload_index(
+            await self.client.create_payload_index(
                 collection_name=self.collection_name,
                 field_name="tags",
                 field_schema=models.PayloadSchemaType.KEYWORD
@@ -61,13 +213,13 @@ class QdrantService:
         else:
             logger.info(f"Collection {self.collection_name} already exists")
     
-    def add_document(self, document: Dict[str, Any]) -> str:
+    async def add_document(self, document: Dict[str, Any]) -> str:
         """Add a single document to the collection"""
         doc_id = document.get("id", str(uuid.uuid4()))
         
         # Create text for embedding (title + content)
-        text_for_embedding = f"{document['title']} {document['content']}"
-        vector = self.embedding_service.encode_single(text_for_embedding)
+        text_for_embedding = _prep_text(document["title"], document["content"])
+        vector = await self.embedding_service.encode_single_async(text_for_embedding)
         
         # Prepare payload
         payload = {
@@ -79,10 +231,11 @@ class QdrantService:
             "tags": document.get("tags", []),
             "metadata": document.get("metadata", {}),
             "created_at": document.get("created_at", datetime.utcnow().isoformat()),
-            "updated_at": document.get("updated_at")
+            "updated_at": document.get("updated_at"),
+            "content_hash": _content_hash(text_for_embedding)
         }
         
-        self.client.upsert(
+        await self.client.upsert(
             collection_name=self.collection_name,
             points=[
                 PointStruct(
@@ -93,19 +246,23 @@ class QdrantService:
             ]
         )
         
+        self._cache_vector(doc_id, vector, payload["content_hash"])
         logger.info(f"Document added with ID: {doc_id}")
         return doc_id
     
-    def add_documents_bulk(self, documents: List[Dict[str, Any]]) -> List[str]:
+    async def add_documents_bulk(self, documents: List[Dict[str, Any]]) -> List[str]:
         """Add multiple documents in bulk"""
         doc_ids = []
         points = []
         
-        # Prepare texts for batch embedding
-        texts = [f"{doc['title']} {doc['content']}" for doc in documents]
-        vectors = self.embedding_service.encode_batch(texts)
+        # Prepare texts for batch embedding; repeated texts are embedded once
+        texts = [_prep_text(doc["title"], doc["content"]) for doc in documents]
+        unique_texts = list(dict.fromkeys(texts))
+        unique_vectors = await self.embedding_service.encode_batch_async(unique_texts)
+        vector_by_text = dict(zip(unique_texts, unique_vectors))
+        vectors = [vector_by_text[text] for text in texts]
         
-        for doc, vector in zip(documents, vectors):
+        for doc, text, vector in zip(documents, texts, vectors):
             doc_id = doc.get("id", str(uuid.uuid4()))
             doc_ids.append(doc_id)
             
@@ -118,7 +275,8 @@ class QdrantService:
                 "tags": doc.get("tags", []),
                 "metadata": doc.get("metadata", {}),
                 "created_at": datetime.utcnow().isoformat(),
-                "updated_at": None
+                "updated_at": None,
+                "content_hash": _content_hash(text)
             }
             
             points.append(PointStruct(
@@ -127,18 +285,88 @@ class QdrantService:
                 payload=payload
             ))
         
-        self.client.upsert(
-            collection_name=self.collection_name,
-            points=points
+        if not points:
+            return doc_ids
+        
+        # Upsert in bounded-concurrency batches without waiting for each to be applied
+        semaphore = asyncio.Semaphore(self.BULK_UPLOAD_CONCURRENCY)
+        
+        async def upsert_batch(batch: List[PointStruct], wait: bool):
+            async with semaphore:
+                await self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=batch,
+                    wait=wait
+                )
+        
+        batches = [
+            points[i:i + self.BULK_BATCH_SIZE]
+            for i in range(0, len(points), self.BULK_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(
+            *[upsert_batch(batch, wait=False) for batch in batches[:-1]],
+            return_exceptions=True
         )
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            logger.error(f"Bulk upload failed: {len(failed)} of {len(batches)} batches rejected")
+            raise failed[0]
+        
+        # Qdrant applies updates in order, so once this last batch is applied,
+        # every earlier batch is applied too and the documents are readable
+        await upsert_batch(batches[-1], wait=True)
+        
+        for point in points:
+            self._cache_vector(point.id, point.vector, point.payload["content_hash"])
         
         logger.info(f"Bulk added {len(doc_ids)} documents")
         return doc_ids
     
-    def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+    @asynccontextmanager
+    async def bulk_upload_mode(self, document_count: int):
+        """Disable HNSW indexing while large bulk uploads run, then restore it
+        
+        Uploads below BULK_INDEXING_PAUSE_MIN documents leave the collection alone.
+        Otherwise the collection's own indexing_threshold is read on entry and put
+        back on exit. Indexing is restored as soon as the body exits, so the body
+        must only return once its writes are applied, not merely accepted.
+        add_documents_bulk guarantees this by sending its final batch with
+        wait=True; any other writes done inside this context need the same waited
+        last write.
+        """
+        if document_count < self.BULK_INDEXING_PAUSE_MIN:
+            yield
+            return
+        
+        self._bulk_uploads += 1
+        try:
+            if self._bulk_uploads == 1:
+                info = await self.client.get_collection(self.collection_name)
+                self._saved_indexing_threshold = info.config.optimizer_config.indexing_threshold
+                await self.client.update_collection(
+                    collection_name=self.collection_name,
+                    optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0)
+                )
+                self._indexing_paused = True
+            yield
+        finally:
+            self._bulk_uploads -= 1
+            # Only the last concurrent upload re-enables indexing, and only if it was paused
+            if self._bulk_uploads == 0 and self._indexing_paused:
+                # A collection reporting no threshold runs on Qdrant's default (20000)
+                threshold = self._saved_indexing_threshold
+                await self.client.update_collection(
+                    collection_name=self.collection_name,
+                    optimizers_config=models.OptimizersConfigDiff(
+                        indexing_threshold=threshold if threshold is not None else 20000
+                    )
+                )
+                self._indexing_paused = False
+    
+    async def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """Get a document by ID"""
         try:
-            results = self.client.retrieve(
+            results = await self.client.retrieve(
                 collection_name=self.collection_name,
                 ids=[doc_id],
                 with_payload=True
@@ -155,57 +383,62 @@ class QdrantService:
             logger.error(f"Error retrieving document {doc_id}: {e}")
             return None
     
-    def update_document(self, doc_id: str, updates: Dict[str, Any]) -> bool:
+    async def update_document(self, doc_id: str, updates: Dict[str, Any]) -> bool:
         """Update a document's payload and re-embed if content changed"""
-        existing = self.get_document(doc_id)
+        existing = await self.get_document(doc_id)
         if not existing:
             return False
         
         # Merge updates
         updated_doc = {**existing, **updates, "updated_at": datetime.utcnow().isoformat()}
         
-        # Re-embed if title or content changed
-        if "title" in updates or "content" in updates:
-            text_for_embedding = f"{updated_doc['title']} {updated_doc['content']}"
-            vector = self.embedding_service.encode_single(text_for_embedding)
+        # Re-embed whenever the stored hash doesn't describe the current text;
+        # this also refreshes vectors of documents stored before content_hash
+        # existed, so the new hash is never written next to a stale vector
+        text_for_embedding = _prep_text(updated_doc["title"], updated_doc["content"])
+        content_hash = _content_hash(text_for_embedding)
+        updated_doc["content_hash"] = content_hash
+        
+        if content_hash != existing.get("content_hash"):
+            vector = await self.embedding_service.encode_single_async(text_for_embedding)
             
-            self.client.upsert(
+            await self.client.update_vectors(
                 collection_name=self.collection_name,
                 points=[
-                    PointStruct(
+                    models.PointVectors(
                         id=doc_id,
-                        vector=vector,
-                        payload=updated_doc
+                        vector=vector
                     )
                 ]
             )
-        else:
-            # Just update payload
-            self.client.set_payload(
-                collection_name=self.collection_name,
-                payload=updated_doc,
-                points=[doc_id]
-            )
+            self._cache_vector(doc_id, vector, content_hash)
+        
+        await self.client.set_payload(
+            collection_name=self.collection_name,
+            payload=updated_doc,
+            points=[doc_id]
+        )
         
         logger.info(f"Document updated: {doc_id}")
         return True
     
-    def delete_document(self, doc_id: str) -> bool:
+    async def delete_document(self, doc_id: str) -> bool:
         """Delete a document by ID"""
         try:
-            self.client.delete(
+            await self.client.delete(
                 collection_name=self.collection_name,
                 points_selector=models.PointIdsList(
                     points=[doc_id]
                 )
             )
+            self._vector_cache.pop(str(doc_id), None)
             logger.info(f"Document deleted: {doc_id}")
             return True
         except Exception as e:
             logger.error(f"Error deleting document {doc_id}: {e}")
             return False
     
-    def search(
+    async def search(
         self,
         query: str,
         limit: int = 10,
@@ -215,72 +448,144 @@ class QdrantService:
         filter_tags: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """Search for documents similar to the query"""
-        query_vector = self.embedding_service.encode_single(query)
+        search_filter = build_filter(
+            filter_category,
+            filter_source_type,
+            tuple(filter_tags) if filter_tags else None
+        )
         
-        # Build filter conditions
-        conditions = []
-        if filter_category:
-            conditions.append(
-                FieldCondition(field_name="category", match=MatchValue(value=filter_category))
-            )
-        if filter_source_type:
-            conditions.append(
-                FieldCondition(field_name="source_type", match=MatchValue(value=filter_source_type))
-            )
-        if filter_tags:
-            for tag in filter_tags:
-                conditions.append(
-                    FieldCondition(field_name="tags", match=MatchValue(value=tag))
-                )
+        if self._search_worker is None:
+            raise RuntimeError("QdrantService is not running; call initialize() first")
         
-        search_filter = Filter(must=conditions) if conditions else None
+        # Hand the query over to the batcher and wait for its share of the batch
+        future = asyncio.get_running_loop().create_future()
+        await self._search_queue.put((query[:MAX_EMBED_CHARS], search_filter, limit, score_threshold, future))
+        return await future
+    
+    async def _search_batcher(self):
+        """Background task that drains queued searches and dispatches them as batches"""
+        loop = asyncio.get_running_loop()
+        window = self.SEARCH_BATCH_WINDOW_MS / 1000
+        # Bounds batches in flight; while all slots are busy, searches wait in the queue
+        slots = asyncio.Semaphore(self.SEARCH_BATCH_CONCURRENCY)
         
-        results = self.client.search(
+        while True:
+            await slots.acquire()
+            batch = []
+            try:
+                batch.append(await self._search_queue.get())
+                deadline = loop.time() + window
+                
+                while len(batch) < self.SEARCH_BATCH_MAX_SIZE:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._search_queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Shutting down: a partially collected batch will never run
+                for *_, future in batch:
+                    future.cancel()
+                raise
+            
+            # Run the batch in the background so the next one can be collected meanwhile
+            task = asyncio.create_task(self._dispatch_search_batch(batch, slots))
+            self._search_tasks[task] = batch
+            task.add_done_callback(lambda t: self._search_tasks.pop(t, None))
+    
+    async def _dispatch_search_batch(self, batch: List[Tuple], slots: asyncio.Semaphore):
+        """Run one search batch, failing its futures on error, and free its slot"""
+        try:
+            await self._run_search_batch(batch)
+        except asyncio.CancelledError:
+            for *_, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Error running search batch of {len(batch)}: {e}")
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            slots.release()
+    
+    async def _run_search_batch(self, batch: List[Tuple]):
+        """Embed all queries in one forward pass and search them in one request"""
+        queries = [query for query, *_ in batch]
+        query_vectors = await self.embedding_service.encode_queries_async(queries)
+        
+        requests = [
+            models.QueryRequest(
+                query=query_vector,
+                filter=search_filter,
+                limit=limit,
+                score_threshold=score_threshold,
+                params=SEARCH_PARAMS,
+                with_payload=True
+            )
+            for query_vector, (_, search_filter, limit, score_threshold, _) in zip(query_vectors, batch)
+        ]
+        
+        responses = await self.client.query_batch_points(
             collection_name=self.collection_name,
-            query_vector=query_vector,
-            query_filter=search_filter,
-            limit=limit,
-            score_threshold=score_threshold,
-            with_payload=True
+            requests=requests,
+            timeout=self.SEARCH_TIMEOUT
         )
         
-        return [
-            {
-                "id": str(r.id),
-                "score": r.score,
-                **r.payload
-            }
-            for r in results
-        ]
+        for response, (*_, future) in zip(responses, batch):
+            # The caller may have gone away (e.g. client disconnect)
+            if future.done():
+                continue
+            future.set_result([
+                {
+                    "id": str(r.id),
+                    "score": r.score,
+                    **r.payload
+                }
+                for r in response.points
+            ])
     
-    def find_similar(
+    async def find_similar(
         self,
         doc_id: str,
         limit: int = 10,
-        score_threshold: float = 0.5
+        score_threshold: float = 0.5,
+        content_hash: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Find documents similar to a given document"""
-        # Get the document's vector
-        points = self.client.retrieve(
-            collection_name=self.collection_name,
-            ids=[doc_id],
-            with_vectors=True
-        )
+        """Find documents similar to a given document
         
-        if not points:
-            return []
-        
-        vector = points[0].vector
+        Pass the document's current content_hash (e.g. from get_document) to
+        allow reusing a cached vector; without it the vector is always fetched.
+        """
+        # Get the document's vector, from the cache if possible
+        vector = self._cached_vector(doc_id, content_hash)
+        if vector is None:
+            points = await self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=[doc_id],
+                with_vectors=True,
+                with_payload=["content_hash"]
+            )
+            
+            if not points:
+                return []
+            
+            vector = points[0].vector
+            self._cache_vector(doc_id, vector, points[0].payload.get("content_hash"))
         
-        results = self.client.search(
+        # Exclude the original document server-side so exactly `limit` matches come back
+        results = await self.client.search(
             collection_name=self.collection_name,
             query_vector=vector,
-            limit=limit + 1,  # +1 to account for the document itself
+            query_filter=Filter(must_not=[models.HasIdCondition(has_id=[doc_id])]),
+            limit=limit,
             score_threshold=score_threshold,
+            search_params=SEARCH_PARAMS,
             with_payload=True
         )
         
-        # Exclude the original document
         return [
             {
                 "id": str(r.id),
@@ -288,10 +593,9 @@ class QdrantService:
                 **r.payload
             }
             for r in results
-            if str(r.id) != doc_id
-        ][:limit]
+        ]
     
-    def get_relationships(
+    async def get_relationships(
         self,
         doc_ids: List[str],
         similarity_threshold: float = 0.6
@@ -301,14 +605,42 @@ class QdrantService:
         edges = []
         seen_edges = set()
         
-        # Get all documents
-        points = self.client.retrieve(
+        # Get all documents; vectors are only transferred if some are not cached
+        fetch_vectors = any(str(doc_id) not in self._vector_cache for doc_id in doc_ids)
+        points = await self.client.retrieve(
             collection_name=self.collection_name,
             ids=doc_ids,
-            with_vectors=True,
+            with_vectors=fetch_vectors,
             with_payload=True
         )
         
+        vectors = {}
+        stale_ids = []
+        for point in points:
+            content_hash = point.payload.get("content_hash")
+            if fetch_vectors:
+                vectors[str(point.id)] = point.vector
+                self._cache_vector(point.id, point.vector, content_hash)
+                continue
+            
+            vector = self._cached_vector(point.id, content_hash)
+            if vector is None:
+                stale_ids.append(point.id)
+            else:
+                vectors[str(point.id)] = vector
+        
+        # Cached vectors whose document changed elsewhere are fetched again
+        if stale_ids:
+            fresh = await self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=stale_ids,
+                with_vectors=True,
+                with_payload=["content_hash"]
+            )
+            for point in fresh:
+                vectors[str(point.id)] = point.vector
+                self._cache_vector(point.id, point.vector, point.payload.get("content_hash"))
+        
         # Create nodes
         for point in points:
             nodes.append({
@@ -318,18 +650,33 @@ class QdrantService:
                 "source_type": point.payload.get("source_type")
             })
         
-        # Find relationships between documents
-        for point in points:
-            similar = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=point.vector,
+        # A document deleted between the two retrieves has no vector to query with
+        sources = [point for point in points if str(point.id) in vectors]
+        if not sources:
+            return nodes, edges
+        
+        # Find relationships between documents in a single batch request,
+        # restricted server-side to the requested documents
+        in_set_filter = Filter(must=[models.HasIdCondition(has_id=doc_ids)])
+        requests = [
+            models.QueryRequest(
+                query=vectors[str(point.id)],
+                filter=in_set_filter,
                 limit=10,
                 score_threshold=similarity_threshold,
-                with_payload=True
+                params=SEARCH_PARAMS,
+                with_payload=False
             )
-            
-            for sim in similar:
-                if str(sim.id) != str(point.id) and str(sim.id) in doc_ids:
+            for point in sources
+        ]
+        responses = await self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=requests
+        )
+        
+        for point, response in zip(sources, responses):
+            for sim in response.points:
+                if str(sim.id) != str(point.id):
                     edge_key = tuple(sorted([str(point.id), str(sim.id)]))
                     if edge_key not in seen_edges:
                         seen_edges.add(edge_key)
@@ -341,22 +688,19 @@ class QdrantService:
         
         return nodes, edges
     
-    def get_collection_stats(self) -> Dict[str, Any]:
+    async def get_collection_stats(self) -> Dict[str, Any]:
         """Get collection statistics"""
-        info = self.client.get_collection(self.collection_name)
-        
-        # Get all documents for aggregation
-        all_points, _ = self.client.scroll(
-            collection_name=self.collection_name,
-            limit=10000,
-            with_payload=True
-        )
+        total = await self.client.count(collection_name=self.collection_name, exact=True)
         
         categories = {}
         source_types = {}
         tags = {}
         
-        for point in all_points:
+        # Page through all documents, fetching only the aggregated fields
+        async for point in self.iter_documents(
+            with_payload=["category", "source_type", "tags"],
+            batch_size=1000
+        ):
             cat = point.payload.get("category")
             if cat:
                 categories[cat] = categories.get(cat, 0) + 1
@@ -365,41 +709,59 @@ class QdrantService:
             if st:
                 source_types[st] = source_types.get(st, 0) + 1
             
-            for tag in point.payload.get("tags", []):
+            for tag in point.payload.get("tags") or []:
                 tags[tag] = tags.get(tag, 0) + 1
         
         return {
-            "total_documents": info.points_count,
+            "total_documents": total.count,
             "categories": categories,
             "source_types": source_types,
             "tags": tags
         }
     
-    def get_all_documents(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get all documents with pagination"""
-        points, _ = self.client.scroll(
+    async def get_all_documents(
+        self,
+        limit: int = 100,
+        offset: Optional[models.ExtendedPointId] = None
+    ) -> Dict[str, Any]:
+        """Get a page of documents; pass the returned next_offset to get the next page"""
+        points, next_offset = await self.client.scroll(
             collection_name=self.collection_name,
             limit=limit,
             offset=offset,
             with_payload=True
         )
         
-        return [
-            {
-                "id": str(point.id),
-                **point.payload
-            }
-            for point in points
-        ]
-
-
-# Global instance
-_qdrant_service = None
-
+        return {
+            "documents": [
+                {
+                    "id": str(point.id),
+                    **point.payload
+                }
+                for point in points
+            ],
+            "next_offset": next_offset
+        }
+    
+    async def iter_documents(
+        self,
+        scroll_filter: Optional[Filter] = None,
+        with_payload: Union[bool, List[str]] = True,
+        batch_size: int = 256
+    ) -> AsyncIterator[models.Record]:
+        """Iterate over every (matching) document in the collection, one scroll page at a time"""
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=with_payload
+            )
+            for point in points:
+                yield point
+            
+            if offset is None:
+                break
 
-def get_qdrant_service() -> QdrantService:
-    """Get or create the Qdrant service singleton"""
-    global _qdrant_service
-    if _qdrant_service is None:
-        _qdrant_service = QdrantService()
-    return _qdrant_service
@@ -126,7 +126,7 @@ function renderSearchResults(results) {
 }
 
 async function loadDocuments() {
-    try { allDocuments = await apiCall('/documents?limit=500'); renderDocuments(); } catch (e) { console.error(e); }
+    try { allDocuments = (await apiCall('/documents?limit=500')).documents; renderDocuments(); } catch (e) { console.error(e); }
 }
 
 function initDocuments() {